@@ -12,7 +12,9 @@ WS_PORT = 8765
 # Seconds to ignore repeated reads of the same tag (prevents rapid-fire scans)
 DEBOUNCE_SECONDS = 3
 
-# NFC polling interval in seconds
+# Seconds between checks for the NFC reader while none is plugged in, and
+# before re-reading a tag that could not be read. Card taps are detected
+# by the PC/SC driver and do not wait on this.
 POLL_INTERVAL = 0.5
 
 # MIFARE Classic authentication key (6 bytes as hex string).
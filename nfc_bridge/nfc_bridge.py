@@ -5,25 +5,41 @@ Bridges the ACR122U USB NFC reader to the attendance web app via WebSocket.
 - Reads NFC tags and sends verified student IDs to connected browsers
 - Accepts write commands from browsers to program new tags
 
-Requires: pyscard, websockets
+Requires: pyscard, websockets (optional: orjson, uvloop)
 Install:  pip install -r requirements.txt
 Run:      python nfc_bridge.py
 """
 
 import asyncio
+import functools
 import hashlib
 import hmac
 import json
 import logging
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
 
 from smartcard.System import readers
-from smartcard.util import toHexString, toBytes
+from smartcard.scard import (
+    INFINITE, SCARD_E_CANCELLED, SCARD_E_TIMEOUT, SCARD_S_SUCCESS, SCARD_SCOPE_USER,
+    SCARD_STATE_CHANGED, SCARD_STATE_PRESENT, SCARD_STATE_UNAVAILABLE,
+    SCARD_STATE_UNAWARE, SCARD_STATE_UNKNOWN,
+    SCardCancel, SCardEstablishContext, SCardGetStatusChange, SCardReleaseContext,
+)
 from smartcard.Exceptions import NoCardException, CardConnectionException
 
 import websockets
 
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib json module
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:  # optional (not available on Windows): default asyncio loop
+    uvloop = None
+
 import config
 
 logging.basicConfig(
@@ -32,31 +48,94 @@ logging.basicConfig(
 )
 log = logging.getLogger("nfc_bridge")
 
+if orjson is not None:
+    def json_dumps(obj) -> str:
+        # orjson returns bytes; decode so messages still go out as text frames
+        return orjson.dumps(obj).decode()
+    json_loads = orjson.loads
+else:
+    json_dumps = json.dumps
+    json_loads = json.loads
+
 # ---------------------------------------------------------------------------
 # HMAC helpers
 # ---------------------------------------------------------------------------
 
-def sign_student_id(student_id: str) -> str:
-    """Create HMAC-SHA256 signature for a student ID."""
-    return hmac.new(
-        config.HMAC_SECRET.encode(),
-        student_id.encode(),
-        hashlib.sha256
-    ).hexdigest()
+# Matches students.student_id VARCHAR(20) in backend/schema.sql
+MAX_STUDENT_ID_LEN = 20
+
+# Placeholder secret shipped in config.py; refuse to run with it.
+DEFAULT_HMAC_SECRET = "change-me-to-a-random-secret-key"
+
+_HMAC_KEY = config.HMAC_SECRET.encode("utf-8")
+
+
+def _hmac_pad_states(key: bytes):
+    """
+    Return (inner, outer) SHA-256 states that have already absorbed the
+    HMAC ipad/opad key blocks (RFC 2104), so signing only has to hash the
+    message and the inner digest.
+    """
+    block_size = hashlib.sha256().block_size
+    if len(key) > block_size:
+        key = hashlib.sha256(key).digest()
+    key = key.ljust(block_size, b"\x00")
+    inner = hashlib.sha256(bytes(b ^ 0x36 for b in key))
+    outer = hashlib.sha256(bytes(b ^ 0x5C for b in key))
+    return inner, outer
+
+
+# Built once at import. Copying the plain hashlib (OpenSSL) states per call
+# is measurably cheaper than copying an hmac object.
+_HMAC_INNER, _HMAC_OUTER = _hmac_pad_states(_HMAC_KEY)
+
+# Raw and hex-encoded signature lengths
+_HMAC_DIGEST_LEN = _HMAC_OUTER.digest_size
+_HMAC_HEX_LEN = _HMAC_DIGEST_LEN * 2
+
+
+def _sign(message: bytes) -> bytes:
+    """HMAC-SHA256 of already-encoded bytes, from the precomputed pad states."""
+    inner = _HMAC_INNER.copy()
+    inner.update(message)
+    outer = _HMAC_OUTER.copy()
+    outer.update(inner.digest())
+    return outer.digest()
 
 
-def make_payload(student_id: str) -> str:
-    """Build the string that gets written to a tag: 'id:hmac'."""
-    return f"{student_id}:{sign_student_id(student_id)}"
+@functools.lru_cache(maxsize=4096)
+def sign_student_id(student_id: str) -> bytes:
+    """
+    Create the raw 32-byte HMAC-SHA256 signature for a student ID.
+    Cached: the same badges are scanned over and over, so repeat scans
+    are a dict lookup instead of a hash.
+    """
+    return _sign(student_id.encode())
+
+
+def make_payload(student_id: str) -> bytes:
+    """Build the ASCII bytes that get written to a tag: b'id:hmac' (hmac as hex)."""
+    sid = student_id.encode("ascii")
+    return sid + b":" + _sign(sid).hex().encode("ascii")
 
 
 def verify_payload(payload: str) -> str | None:
-    """Verify a tag payload. Returns student_id if valid, None otherwise."""
-    if ":" not in payload:
+    """
+    Verify a tag payload. Returns student_id if valid, None otherwise.
+    Payloads that aren't shaped like '<id>:<64 hex chars>', or whose ID
+    is longer than we would ever write, are rejected before any hashing.
+    """
+    sep = payload.rfind(":")
+    if sep < 1 or sep > MAX_STUDENT_ID_LEN or len(payload) - sep - 1 != _HMAC_HEX_LEN:
         return None
-    student_id, tag_hmac = payload.split(":", 1)
-    expected = sign_student_id(student_id)
-    if hmac.compare_digest(tag_hmac, expected):
+    try:
+        tag = bytes.fromhex(payload[sep + 1:])
+    except ValueError:
+        return None
+    if len(tag) != _HMAC_DIGEST_LEN:
+        return None  # fromhex() skips whitespace, so 64 chars can decode short
+    student_id = payload[:sep]
+    if hmac.compare_digest(tag, sign_student_id(student_id)):
         return student_id
     return None
 
@@ -78,12 +157,19 @@ TAG_TYPES = {
 }
 
 # MIFARE Classic authentication key (from config, parsed from hex string)
-MIFARE_KEY = [int(config.MIFARE_KEY[i:i+2], 16) for i in range(0, 12, 2)]
+MIFARE_KEY = bytes.fromhex(config.MIFARE_KEY[:12])
 
 # MIFARE Classic 1K data blocks (skip block 0 = manufacturer, skip sector trailers 3,7,11...)
 # Sector 1: blocks 4,5,6 (trailer=7)  Sector 2: blocks 8,9,10 (trailer=11)
 MIFARE_DATA_BLOCKS = [4, 5, 6, 8, 9, 10]
 
+# The same blocks grouped by sector, so each sector is authenticated once
+# up front instead of checking for a sector change on every block
+MIFARE_DATA_SECTORS = [
+    [b for b in MIFARE_DATA_BLOCKS if b // 4 == sector]
+    for sector in sorted({b // 4 for b in MIFARE_DATA_BLOCKS})
+]
+
 
 def get_reader():
     """Return the first available PC/SC reader, or None."""
@@ -93,6 +179,146 @@ def get_reader():
     return None
 
 
+class CardWatcher:
+    """
+    Waits inside the PC/SC driver (SCardGetStatusChange) for a card to be
+    presented, instead of connecting to the reader on a timer to find out.
+    The context is created lazily on the thread that does the waiting.
+    reader_name is reset to None when the reader disappears or PC/SC
+    errors, telling the caller to enumerate readers again.
+    """
+
+    # Pseudo-reader that PC/SC signals when readers are plugged in or removed
+    PNP_NOTIFICATION = "\\\\?PnP?\\Notification"
+    # Upper bound on a single card wait (ms), so a wake() that lands just
+    # before the wait starts blocking is still noticed promptly
+    CARD_WAIT_TIMEOUT_MS = 500
+
+    def __init__(self):
+        self.context = None
+        self.reader_name: str | None = None
+        self.current_state = SCARD_STATE_UNAWARE
+        self.pnp_state = SCARD_STATE_UNAWARE
+        # Set by wake(). SCardCancel only interrupts a wait that is already
+        # blocked, so this catches wake-ups that arrive while the NFC thread
+        # is busy talking to a card or about to start waiting.
+        self.wake_requested = threading.Event()
+
+    def _ensure_context(self) -> bool:
+        """Establish the PC/SC context if needed. Returns False on failure."""
+        if self.context is not None:
+            return True
+        hresult, context = SCardEstablishContext(SCARD_SCOPE_USER)
+        if hresult != SCARD_S_SUCCESS:
+            log.error("SCardEstablishContext failed: 0x%08X", hresult & 0xFFFFFFFF)
+            return False
+        self.context = context
+        return True
+
+    def _drop_context(self):
+        """
+        Release the context after a PC/SC error. On Windows the smart card
+        service stops when the last reader is unplugged, which invalidates it.
+        """
+        if self.context is not None:
+            SCardReleaseContext(self.context)
+        self.context = None
+        self.pnp_state = SCARD_STATE_UNAWARE
+
+    def wait_for_reader(self):
+        """
+        Block until a reader is plugged in or removed, or until wake() is
+        called. Falls back to sleeping POLL_INTERVAL where PC/SC doesn't
+        support PnP notification.
+        """
+        if self._ensure_context():
+            hresult, reader_states = SCardGetStatusChange(
+                self.context, INFINITE, [(self.PNP_NOTIFICATION, self.pnp_state)]
+            )
+            if hresult == SCARD_S_SUCCESS:
+                _, event_state, _ = reader_states[0]
+                if not event_state & SCARD_STATE_UNKNOWN:
+                    self.pnp_state = event_state & ~SCARD_STATE_CHANGED
+                    return
+            elif hresult == SCARD_E_CANCELLED:
+                return
+            else:
+                log.debug("PnP notification wait failed: 0x%08X", hresult & 0xFFFFFFFF)
+                self._drop_context()
+        time.sleep(config.POLL_INTERVAL)
+
+    def wait_for_card(self, reader_name: str) -> bool:
+        """
+        Block until a card is placed on or removed from reader_name, or
+        until wake() is called. Other state changes (e.g. our own
+        connection marking the card in use) are waited through. The first
+        call for a new reader returns straight away with whatever is on it,
+        so the caller learns the reader is up before anyone taps a card.
+        Returns True if a card is on the reader.
+        """
+        if not self._ensure_context():
+            self.reader_name = None
+            return False
+
+        if reader_name != self.reader_name:
+            self.reader_name = reader_name
+            self.current_state = SCARD_STATE_UNAWARE
+
+        while True:
+            first_query = self.current_state == SCARD_STATE_UNAWARE
+            was_present = bool(self.current_state & SCARD_STATE_PRESENT)
+            if self.wake_requested.is_set():
+                # Woken up before we got here (e.g. a write was requested)
+                self.wake_requested.clear()
+                return was_present
+            hresult, reader_states = SCardGetStatusChange(
+                self.context, self.CARD_WAIT_TIMEOUT_MS, [(reader_name, self.current_state)]
+            )
+            if hresult == SCARD_E_TIMEOUT:
+                # Nothing changed; loop to re-check wake_requested
+                continue
+            if hresult == SCARD_E_CANCELLED:
+                # Woken up early (e.g. a write was requested) — report what we last saw
+                self.wake_requested.clear()
+                return was_present
+            if hresult != SCARD_S_SUCCESS:
+                log.debug("SCardGetStatusChange failed: 0x%08X", hresult & 0xFFFFFFFF)
+                self._drop_context()
+                self.reader_name = None
+                return False
+
+            _, event_state, _ = reader_states[0]
+            if event_state & (SCARD_STATE_UNAVAILABLE | SCARD_STATE_UNKNOWN):
+                # Reader went away; the next poll re-enumerates readers
+                self.reader_name = None
+                return False
+
+            self.current_state = event_state & ~SCARD_STATE_CHANGED
+            is_present = bool(event_state & SCARD_STATE_PRESENT)
+            if first_query or is_present != was_present:
+                return is_present
+
+    def rescan(self):
+        """
+        Make the next wait_for_card() report the card on the reader again
+        instead of waiting for it to be removed, e.g. after a failed read.
+        """
+        self.current_state = SCARD_STATE_UNAWARE
+
+    def wake(self):
+        """
+        Interrupt a pending wait_for_card() from another thread, or make
+        the next one return immediately if the NFC thread isn't waiting yet.
+        """
+        self.wake_requested.set()
+        if self.context is not None:
+            SCardCancel(self.context)
+
+
+# PC/SC registered application provider ID in contactless card ATRs
+_PCSC_RID = b"\xA0\x00\x00\x03\x06"
+
+
 def _get_tag_type_byte(atr):
     """
     Extract the tag type byte from a PC/SC contactless ATR.
@@ -100,15 +326,21 @@ def _get_tag_type_byte(atr):
     the card type byte 2 positions after: <standard> <name_hi> <name_lo>.
     Returns the name_lo byte, or None if not found.
     """
-    rid = [0xA0, 0x00, 0x00, 0x03, 0x06]
-    for i in range(len(atr) - len(rid)):
-        if atr[i:i + len(rid)] == rid:
-            type_idx = i + len(rid) + 2  # skip standard + name_hi
-            if type_idx < len(atr):
-                return atr[type_idx]
+    atr = bytes(atr)
+    i = atr.find(_PCSC_RID)
+    if i < 0:
+        return None
+    type_idx = i + len(_PCSC_RID) + 2  # skip standard + name_hi
+    if type_idx < len(atr):
+        return atr[type_idx]
     return None
 
 
+def _hex(data) -> str:
+    """Format a list of byte values like 'FF 00 A2' for logging."""
+    return bytes(data).hex(" ").upper()
+
+
 def connect_to_card(reader):
     """
     Try to connect to a card on the reader.
@@ -119,15 +351,23 @@ def connect_to_card(reader):
         connection = reader.createConnection()
         connection.connect()
         atr = connection.getATR()
-        atr_str = toHexString(atr)
         type_byte = _get_tag_type_byte(atr)
-        tag_type = TAG_TYPES.get(type_byte, f"unknown (0x{type_byte:02X})" if type_byte is not None else "unknown")
-        log.info("Card detected — ATR: %s — Type: %s", atr_str, tag_type)
+        if log.isEnabledFor(logging.INFO):
+            tag_type = TAG_TYPES.get(type_byte, f"unknown (0x{type_byte:02X})" if type_byte is not None else "unknown")
+            log.info("Card detected — ATR: %s — Type: %s", _hex(atr), tag_type)
         return connection, type_byte
     except (NoCardException, CardConnectionException):
         return None, None
 
 
+# PN532 RFConfiguration: disable RF field (auto RFCA off, RF off)
+_RF_OFF_APDU = [0xFF, 0x00, 0x00, 0x00, 0x04, 0xD4, 0x32, 0x01, 0x00]
+# PN532 RFConfiguration: enable RF field (auto RFCA on, RF always on)
+# Value 0x03 = bit0 (auto RFCA) + bit1 (RF on). Using 0x01 would let
+# the PN532 drop RF between APDUs, breaking MIFARE Classic auth state.
+_RF_ON_APDU = [0xFF, 0x00, 0x00, 0x00, 0x04, 0xD4, 0x32, 0x01, 0x03]
+
+
 def _reset_rf_field(connection):
     """
     Toggle the ACR122U's RF antenna off and on to force the PN532
@@ -136,31 +376,38 @@ def _reset_rf_field(connection):
     commands to a MIFARE Classic card, or vice versa).
     """
     try:
-        # PN532 RFConfiguration: disable RF field (auto RFCA off, RF off)
-        connection.transmit([0xFF, 0x00, 0x00, 0x00, 0x04, 0xD4, 0x32, 0x01, 0x00])
+        connection.transmit(_RF_OFF_APDU)
         time.sleep(0.1)
-        # PN532 RFConfiguration: enable RF field (auto RFCA on, RF always on)
-        # Value 0x03 = bit0 (auto RFCA) + bit1 (RF on). Using 0x01 would let
-        # the PN532 drop RF between APDUs, breaking MIFARE Classic auth state.
-        connection.transmit([0xFF, 0x00, 0x00, 0x00, 0x04, 0xD4, 0x32, 0x01, 0x03])
+        connection.transmit(_RF_ON_APDU)
     except Exception:
         pass
 
 
-def _ntag_transceive(connection, cmd_bytes):
+# ACR122U direct-transmit escape APDU header and PN532 InCommunicateThru command
+_APDU_PREFIX = b"\xFF\x00\x00\x00"
+_IN_COMMUNICATE_THRU = b"\xD4\x42"
+_IN_COMMUNICATE_THRU_HEADER_LEN = len(_APDU_PREFIX) + 1 + len(_IN_COMMUNICATE_THRU)
+
+
+def _ntag_transceive(connection, cmd_bytes: bytes, quiet=False):
     """
     Send a native NFC command to the tag via ACR122U direct transmit
     (PN532 InCommunicateThru).  Returns response data bytes on success,
-    or None on failure.
+    or None on failure. quiet=True logs a tag-level failure at debug
+    level, for commands the tag is allowed to reject.
 
     The ACR122U escape APDU is: FF 00 00 00 <Lc> D4 42 <native_cmd>
     PN532 responds with:        D5 43 <status> [data...]
     Status 0x00 = success.
     """
-    inner = [0xD4, 0x42] + list(cmd_bytes)
-    apdu = [0xFF, 0x00, 0x00, 0x00, len(inner)] + inner
+    apdu = bytearray(_IN_COMMUNICATE_THRU_HEADER_LEN + len(cmd_bytes))
+    apdu[0:4] = _APDU_PREFIX
+    apdu[4] = len(_IN_COMMUNICATE_THRU) + len(cmd_bytes)  # Lc
+    apdu[5:7] = _IN_COMMUNICATE_THRU
+    apdu[7:] = cmd_bytes
     try:
-        data, sw1, sw2 = connection.transmit(apdu)
+        # pyscard expects a list of ints
+        data, sw1, sw2 = connection.transmit(list(apdu))
     except CardConnectionException as e:
         log.error("Transmit error: %s", e)
         return None
@@ -171,70 +418,102 @@ def _ntag_transceive(connection, cmd_bytes):
 
     # Expect D5 43 <status> [payload...]
     if len(data) < 3 or data[0] != 0xD5 or data[1] != 0x43:
-        log.error("Unexpected PN532 response: %s", toHexString(data))
+        log.error("Unexpected PN532 response: %s", _hex(data))
         return None
 
     if data[2] != 0x00:
-        log.error("Tag command failed, PN532 status: 0x%02X", data[2])
+        log.log(logging.DEBUG if quiet else logging.ERROR,
+                "Tag command failed, PN532 status: 0x%02X", data[2])
         return None
 
     return data[3:]  # payload bytes (may be empty for WRITE)
 
 
+# PN532 InListPassiveTarget: 1 target, 106 kbps ISO14443A
+_IN_LIST_PASSIVE_TARGET_APDU = [0xFF, 0x00, 0x00, 0x00, 0x04, 0xD4, 0x4A, 0x01, 0x00]
+
+
+def _reselect_target(connection) -> bool:
+    """
+    Wake and re-select the tag on the reader (REQA + anticollision/select).
+    A tag that NAKs a command drops back to IDLE and ignores everything
+    until it is selected again.
+    """
+    try:
+        data, sw1, sw2 = connection.transmit(_IN_LIST_PASSIVE_TARGET_APDU)
+    except CardConnectionException as e:
+        log.error("Re-select transmit error: %s", e)
+        return False
+    # Expect D5 4B <number of targets found> ...
+    if sw1 != 0x90 or sw2 != 0x00 or len(data) < 3 or data[:2] != [0xD5, 0x4B] or data[2] == 0:
+        log.error("Failed to re-select tag")
+        return False
+    return True
+
+
 def read_tag_data(connection, max_pages=20) -> str | None:
     """
     Read user data from an NTAG tag (pages 4+).
-    Uses the native NTAG READ command (0x30) via PN532 InCommunicateThru.
-    Each READ returns 16 bytes (4 pages).
+    Uses the native NTAG FAST_READ command (0x3A) via PN532 InCommunicateThru
+    to fetch every page in one round trip. Falls back to READ (0x30, 16 bytes
+    / 4 pages per command) for tags that don't support FAST_READ (NTAG203,
+    Ultralight C), re-selecting the tag first since the NAK leaves it IDLE.
     """
-    raw_bytes = []
+    raw_bytes = bytearray()
     page = 4
     end_page = 4 + max_pages
 
+    # NTAG FAST_READ: 0x3A <start_page> <end_page> — returns 4 bytes per page.
+    # Tags without FAST_READ answer with an error status or a short NAK.
+    resp = _ntag_transceive(connection, bytes((0x3A, page, end_page - 1)), quiet=True)
+    if resp is not None and len(resp) >= max_pages * 4:
+        raw_bytes += bytes(resp[:max_pages * 4])
+        page = end_page
+    elif not _reselect_target(connection):
+        return None
+
     while page < end_page:
         # NTAG READ: 0x30 <page> — returns 16 bytes (4 pages)
-        resp = _ntag_transceive(connection, [0x30, page])
+        resp = _ntag_transceive(connection, bytes((0x30, page)))
         if resp is None:
             break
-        raw_bytes.extend(resp[:16])
+        raw_bytes += bytes(resp[:16])
         page += 4  # READ returns 4 pages at a time
 
     if not raw_bytes:
         return None
 
     # Find the null terminator or end of data
-    try:
-        end = raw_bytes.index(0x00)
+    end = raw_bytes.find(b"\x00")
+    if end != -1:
         raw_bytes = raw_bytes[:end]
-    except ValueError:
-        pass  # no null terminator, use all bytes
 
     if not raw_bytes:
         return None
 
     try:
-        return bytes(raw_bytes).decode("ascii").strip()
+        return raw_bytes.decode("ascii")
     except (UnicodeDecodeError, ValueError):
         return None
 
 
-def write_tag_data(connection, payload: str) -> bool:
+def write_tag_data(connection, payload: bytes) -> bool:
     """
-    Write an ASCII string payload to an NTAG tag starting at page 4.
+    Write an ASCII payload (see make_payload) to an NTAG tag starting at page 4.
     Uses the native NTAG WRITE command (0xA2) via PN532 InCommunicateThru.
     Each WRITE sends 4 bytes (1 page).
     """
-    data = list(payload.encode("ascii")) + [0x00]
+    data = bytearray(payload)
+    data.append(0x00)
 
     # Pad to multiple of 4 bytes (NTAG page size)
-    while len(data) % 4 != 0:
-        data.append(0x00)
+    data.extend(bytes(-len(data) % 4))
 
     page = 4
     for i in range(0, len(data), 4):
         chunk = data[i:i + 4]
         # NTAG WRITE: 0xA2 <page> <b0> <b1> <b2> <b3>
-        resp = _ntag_transceive(connection, [0xA2, page] + chunk)
+        resp = _ntag_transceive(connection, bytes((0xA2, page)) + chunk)
         if resp is None:
             log.error("Write failed at page %d", page)
             return False
@@ -248,14 +527,27 @@ def write_tag_data(connection, payload: str) -> bool:
 # MIFARE Classic communication
 # ---------------------------------------------------------------------------
 
+# Constant APDU headers; the variable bytes are appended per call
+_MIFARE_LOAD_KEY_HEADER = b"\xFF\x82\x00"
+_MIFARE_AUTH_HEADER = b"\xFF\x86\x00\x00\x05\x01\x00"
+_MIFARE_READ_HEADER = b"\xFF\xB0\x00"
+_MIFARE_WRITE_HEADER = b"\xFF\xD6\x00"
+
+# Load-key APDU for the configured key into slot 0, used on every MIFARE read/write
+_MIFARE_LOAD_DEFAULT_KEY_APDU = list(_MIFARE_LOAD_KEY_HEADER + bytes((0x00, 0x06)) + MIFARE_KEY)
+
+
 def _mifare_load_key(connection, key_bytes=None, key_slot=0x00):
     """
     Load an authentication key into the ACR122U key store.
     APDU: FF 82 00 <key_slot> 06 <6-byte key>
     """
-    if key_bytes is None:
-        key_bytes = MIFARE_KEY
-    apdu = [0xFF, 0x82, 0x00, key_slot, 0x06] + list(key_bytes)
+    if key_bytes is None and key_slot == 0x00:
+        apdu = _MIFARE_LOAD_DEFAULT_KEY_APDU
+    else:
+        if key_bytes is None:
+            key_bytes = MIFARE_KEY
+        apdu = list(_MIFARE_LOAD_KEY_HEADER + bytes((key_slot, 0x06)) + bytes(key_bytes))
     try:
         data, sw1, sw2 = connection.transmit(apdu)
     except CardConnectionException as e:
@@ -274,10 +566,9 @@ def _mifare_auth_block(connection, block, key_slot=0x00):
     APDU: FF 86 00 00 05 01 00 <block> <key_type> <key_slot>
     """
     for key_type, key_name in [(0x60, "A"), (0x61, "B")]:
-        apdu = [0xFF, 0x86, 0x00, 0x00, 0x05,
-                0x01, 0x00, block, key_type, key_slot]
+        apdu = _MIFARE_AUTH_HEADER + bytes((block, key_type, key_slot))
         try:
-            data, sw1, sw2 = connection.transmit(apdu)
+            data, sw1, sw2 = connection.transmit(list(apdu))
         except CardConnectionException as e:
             log.error("Auth block %d (Key %s) transmit error: %s", block, key_name, e)
             continue
@@ -296,9 +587,9 @@ def _mifare_read_block(connection, block):
     APDU: FF B0 00 <block> 10
     Returns 16 bytes on success, None on failure.
     """
-    apdu = [0xFF, 0xB0, 0x00, block, 0x10]
+    apdu = _MIFARE_READ_HEADER + bytes((block, 0x10))
     try:
-        data, sw1, sw2 = connection.transmit(apdu)
+        data, sw1, sw2 = connection.transmit(list(apdu))
     except CardConnectionException as e:
         log.error("Read block %d transmit error: %s", block, e)
         return None
@@ -308,18 +599,18 @@ def _mifare_read_block(connection, block):
     return list(data)
 
 
-def _mifare_write_block(connection, block, data_bytes):
+def _mifare_write_block(connection, block, data_bytes: bytes):
     """
     Write 16 bytes to a MIFARE Classic block (must be authenticated first).
     APDU: FF D6 00 <block> 10 <16 bytes>
-    data_bytes must be exactly 16 bytes.
+    data_bytes must be exactly 16 bytes (bytes or bytearray).
     """
     if len(data_bytes) != 16:
         log.error("Write block %d: data must be 16 bytes, got %d", block, len(data_bytes))
         return False
-    apdu = [0xFF, 0xD6, 0x00, block, 0x10] + list(data_bytes)
+    apdu = _MIFARE_WRITE_HEADER + bytes((block, 0x10)) + data_bytes
     try:
-        data, sw1, sw2 = connection.transmit(apdu)
+        data, sw1, sw2 = connection.transmit(list(apdu))
     except CardConnectionException as e:
         log.error("Write block %d transmit error: %s", block, e)
         return False
@@ -338,55 +629,59 @@ def read_tag_data_mifare(connection) -> str | None:
     """
     Read user data from a MIFARE Classic tag.
     Reads data blocks across sectors 1-2 (blocks 4,5,6,8,9,10).
-    Each block is 16 bytes, giving 96 bytes total.
+    Each block is 16 bytes, giving 96 bytes total. Stops at the first
+    block containing the null terminator.
     """
     if not _mifare_load_key(connection):
         log.error("Failed to load MIFARE key")
         return None
 
-    raw_bytes = []
-    last_sector = -1
-
-    for block in MIFARE_DATA_BLOCKS:
-        sector = _sector_of_block(block)
-        if sector != last_sector:
-            if not _mifare_auth_block(connection, block):
-                log.error("Failed to authenticate sector %d (block %d)", sector, block)
-                return None
-            last_sector = sector
+    raw_bytes = bytearray()
+    terminated = False
 
-        data = _mifare_read_block(connection, block)
-        if data is None:
-            log.error("Failed to read block %d", block)
+    for blocks in MIFARE_DATA_SECTORS:
+        if not _mifare_auth_block(connection, blocks[0]):
+            log.error("Failed to authenticate sector %d (block %d)",
+                      _sector_of_block(blocks[0]), blocks[0])
             return None
-        raw_bytes.extend(data)
+
+        for block in blocks:
+            data = _mifare_read_block(connection, block)
+            if data is None:
+                log.error("Failed to read block %d", block)
+                return None
+            raw_bytes += bytes(data)
+            if 0x00 in data:
+                terminated = True
+                break
+        if terminated:
+            break
 
     if not raw_bytes:
         return None
 
     # Find the null terminator
-    try:
-        end = raw_bytes.index(0x00)
+    end = raw_bytes.find(b"\x00")
+    if end != -1:
         raw_bytes = raw_bytes[:end]
-    except ValueError:
-        pass
 
     if not raw_bytes:
         return None
 
     try:
-        return bytes(raw_bytes).decode("ascii").strip()
+        return raw_bytes.decode("ascii")
     except (UnicodeDecodeError, ValueError):
         return None
 
 
-def write_tag_data_mifare(connection, payload: str) -> bool:
+def write_tag_data_mifare(connection, payload: bytes) -> bool:
     """
-    Write an ASCII string payload to a MIFARE Classic tag.
+    Write an ASCII payload (see make_payload) to a MIFARE Classic tag.
     Writes across data blocks in sectors 1-2 (blocks 4,5,6,8,9,10).
     Max payload: 95 bytes (96 bytes minus null terminator).
     """
-    data = list(payload.encode("ascii")) + [0x00]
+    data = bytearray(payload)
+    data.append(0x00)
 
     max_capacity = len(MIFARE_DATA_BLOCKS) * 16
     if len(data) > max_capacity:
@@ -395,34 +690,31 @@ def write_tag_data_mifare(connection, payload: str) -> bool:
         return False
 
     # Pad to fill remaining blocks with zeros
-    while len(data) % 16 != 0:
-        data.append(0x00)
+    data.extend(bytes(-len(data) % 16))
 
     if not _mifare_load_key(connection):
         log.error("Failed to load MIFARE key")
         return False
 
-    last_sector = -1
-    block_idx = 0
+    offset = 0
 
-    for i in range(0, len(data), 16):
-        if block_idx >= len(MIFARE_DATA_BLOCKS):
+    for blocks in MIFARE_DATA_SECTORS:
+        if offset >= len(data):
             break
-        block = MIFARE_DATA_BLOCKS[block_idx]
-        sector = _sector_of_block(block)
+        if not _mifare_auth_block(connection, blocks[0]):
+            log.error("Failed to authenticate sector %d (block %d)",
+                      _sector_of_block(blocks[0]), blocks[0])
+            return False
 
-        if sector != last_sector:
-            if not _mifare_auth_block(connection, block):
-                log.error("Failed to authenticate sector %d (block %d)", sector, block)
+        for block in blocks:
+            if offset >= len(data):
+                break
+            chunk = bytes(data[offset:offset + 16])
+            if not _mifare_write_block(connection, block, chunk):
+                log.error("Write failed at block %d", block)
                 return False
-            last_sector = sector
-
-        chunk = data[i:i + 16]
-        if not _mifare_write_block(connection, block, chunk):
-            log.error("Write failed at block %d", block)
-            return False
-        log.debug("Wrote block %d OK", block)
-        block_idx += 1
+            log.debug("Wrote block %d OK", block)
+            offset += 16
 
     return True
 
@@ -431,19 +723,27 @@ def write_tag_data_mifare(connection, payload: str) -> bool:
 # Bridge state
 # ---------------------------------------------------------------------------
 
+# Debounce window as integer nanoseconds, compared against time.monotonic_ns()
+_DEBOUNCE_NS = int(config.DEBOUNCE_SECONDS * 1_000_000_000)
+
+
 class BridgeState:
     def __init__(self):
         self.clients: set[websockets.WebSocketServerProtocol] = set()
         self.write_pending: str | None = None   # student_id to write, or None
         self.last_scan_id: str | None = None
-        self.last_scan_time: float = 0
+        self.last_scan_time: int = 0            # time.monotonic_ns()
         self.reader_connected: bool = False
         self.last_error_event: str | None = None
-        self.last_error_time: float = 0
+        self.last_error_time: int = 0           # time.monotonic_ns()
+        self.reader = None                      # cached PC/SC reader, re-enumerated only when lost
+        self.connection = None                  # cached PC/SC connection to the card on the reader
+        self.card_type: int | None = None       # tag type byte of the cached connection
+        self.card_retries: int = 0              # re-reads of the card currently on the reader
 
     def should_debounce(self, student_id: str) -> bool:
-        now = time.time()
-        if student_id == self.last_scan_id and (now - self.last_scan_time) < config.DEBOUNCE_SECONDS:
+        now = time.monotonic_ns()
+        if student_id == self.last_scan_id and (now - self.last_scan_time) < _DEBOUNCE_NS:
             return True
         self.last_scan_id = student_id
         self.last_scan_time = now
@@ -451,8 +751,8 @@ class BridgeState:
 
     def should_debounce_error(self, event: str) -> bool:
         """Suppress repeated error events from the same card sitting on the reader."""
-        now = time.time()
-        if event == self.last_error_event and (now - self.last_error_time) < config.DEBOUNCE_SECONDS:
+        now = time.monotonic_ns()
+        if event == self.last_error_event and (now - self.last_error_time) < _DEBOUNCE_NS:
             return True
         self.last_error_event = event
         self.last_error_time = now
@@ -464,25 +764,85 @@ class BridgeState:
 
 
 state = BridgeState()
-executor = ThreadPoolExecutor(max_workers=1)
+card_watcher = CardWatcher()
 
 
 # ---------------------------------------------------------------------------
 # WebSocket server
 # ---------------------------------------------------------------------------
 
-async def broadcast(message: dict):
-    """Send a JSON message to all connected browser clients."""
+# Seconds a single client may take to accept a broadcast before it is dropped
+SEND_TIMEOUT = 1.0
+
+# Messages that never change, serialized once. Kept as str so they go out as
+# text frames — the browser JSON.parse()s event.data directly.
+MSG_READER_CONNECTED = json_dumps({"type": "reader_status", "connected": True})
+MSG_READER_DISCONNECTED = json_dumps({"type": "reader_status", "connected": False})
+MSG_INVALID_TAG = json_dumps({"type": "error", "message": "Invalid or unsigned tag"})
+
+# tag_scan template for student IDs that need no JSON escaping
+_TAG_SCAN_TEMPLATE = '{"type": "tag_scan", "student_id": "%s"}'
+
+# Strong references to fire-and-forget tasks so they aren't garbage collected
+_background_tasks: set[asyncio.Task] = set()
+
+
+def reader_status_message(connected: bool) -> str:
+    """Return the pre-serialized reader_status message."""
+    return MSG_READER_CONNECTED if connected else MSG_READER_DISCONNECTED
+
+
+# One error message per tag type name poll_nfc_blocking can report
+_UNSUPPORTED_TAG_MESSAGES = {
+    name: json_dumps({"type": "error", "message": f"Unsupported tag type: {name}"})
+    for name in [*TAG_TYPES.values(), "unknown"]
+}
+
+
+def unsupported_tag_message(tag_type: str) -> str:
+    """Return the pre-serialized unsupported-tag error for tag_type."""
+    message = _UNSUPPORTED_TAG_MESSAGES.get(tag_type)
+    if message is None:
+        message = json_dumps({"type": "error", "message": f"Unsupported tag type: {tag_type}"})
+    return message
+
+
+def tag_scan_message(student_id: str) -> str:
+    """Serialize a tag_scan message, skipping the JSON encoder for plain IDs."""
+    if student_id.isascii() and student_id.isalnum():
+        return _TAG_SCAN_TEMPLATE % student_id
+    return json_dumps({"type": "tag_scan", "student_id": student_id})
+
+
+async def broadcast(text: str):
+    """
+    Send an already-serialized message to all connected browser clients
+    concurrently, so one slow browser can't hold up the others. Clients that
+    have disconnected or don't accept the message within SEND_TIMEOUT are dropped.
+    """
     if not state.clients:
         return
-    text = json.dumps(message)
-    disconnected = set()
-    for ws in state.clients:
-        try:
-            await ws.send(text)
-        except websockets.ConnectionClosed:
-            disconnected.add(ws)
-    state.clients -= disconnected
+    clients = list(state.clients)
+    results = await asyncio.gather(
+        *(asyncio.wait_for(ws.send(text), SEND_TIMEOUT) for ws in clients),
+        return_exceptions=True
+    )
+    for ws, result in zip(clients, results):
+        if isinstance(result, websockets.ConnectionClosed):
+            state.clients.discard(ws)
+        elif isinstance(result, asyncio.TimeoutError):
+            log.warning("Dropping unresponsive browser client")
+            state.clients.discard(ws)
+            task = asyncio.create_task(ws.close())
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+        elif isinstance(result, Exception):
+            log.error("Broadcast to browser failed: %s", result)
+
+
+# Browser messages are tiny; anything bigger than this is rejected by the
+# websockets library before it reaches handle_client
+MAX_MESSAGE_SIZE = 4096
 
 
 async def handle_client(websocket):
@@ -491,25 +851,30 @@ async def handle_client(websocket):
     log.info("Browser connected (%d total)", len(state.clients))
 
     # Send current reader status
-    await websocket.send(json.dumps({
-        "type": "reader_status",
-        "connected": state.reader_connected
-    }))
+    await websocket.send(reader_status_message(state.reader_connected))
 
     try:
         async for raw in websocket:
             try:
-                msg = json.loads(raw)
-            except json.JSONDecodeError:
+                msg = json_loads(raw)
+            except json.JSONDecodeError:  # also raised by orjson
+                continue
+            if not isinstance(msg, dict):
                 continue
 
             msg_type = msg.get("type")
 
             if msg_type == "write_tag":
                 student_id = msg.get("student_id")
+                if (not isinstance(student_id, str) or not student_id.isascii()
+                        or len(student_id) > MAX_STUDENT_ID_LEN):
+                    log.warning("Ignoring write request with invalid student ID")
+                    continue
                 if student_id:
                     state.write_pending = student_id
                     log.info("Write requested for student %s", student_id)
+                    # A tag may already be sitting on the reader
+                    card_watcher.wake()
 
             elif msg_type == "cancel_write":
                 state.write_pending = None
@@ -531,19 +896,72 @@ def _is_mifare_classic(type_byte):
     return type_byte in (TAG_TYPE_MIFARE_1K, TAG_TYPE_MIFARE_4K)
 
 
+def _release_card():
+    """Disconnect and forget the cached card connection, if any."""
+    if state.connection is not None:
+        try:
+            state.connection.disconnect()
+        except Exception:
+            pass
+    state.connection = None
+    state.card_type = None
+
+
+# How many times a card that stays on the reader is re-read after a failed
+# connect or read before waiting for it to be removed
+MAX_CARD_RETRIES = 3
+
+
+def _retry_card() -> bool:
+    """
+    Have the next poll cycle read the card on the reader again, unless it
+    has already been retried MAX_CARD_RETRIES times. Returns True if a
+    retry was scheduled.
+    """
+    if state.card_retries >= MAX_CARD_RETRIES:
+        return False
+    state.card_retries += 1
+    card_watcher.rescan()
+    return True
+
+
 def poll_nfc_blocking():
     """
-    Blocking function that runs one poll cycle.
-    Returns a dict describing what happened, or None.
+    Blocking function that runs one poll cycle. Waits in the PC/SC driver
+    until a card is presented (or a write is requested while one is
+    already present) before touching the reader.
+    The card connection is kept open until the card is removed or a
+    command fails, so a write on a card that is already present reuses it.
+    A card that cannot be connected to or read is tried again a few times
+    while it stays on the reader.
+    The reader is only enumerated again after it has been lost.
+    Returns a dict describing what happened.
     """
-    reader = get_reader()
+    if state.reader is None:
+        state.reader = get_reader()
+    reader = state.reader
     if reader is None:
+        _release_card()
         return {"event": "no_reader"}
 
-    connection, type_byte = connect_to_card(reader)
-    if connection is None:
+    card_present = card_watcher.wait_for_card(str(reader))
+    if card_watcher.reader_name is None:
+        # Reader unplugged or PC/SC failed — start over with a fresh reader list
+        state.reader = None
+        _release_card()
+        return {"event": "no_reader"}
+
+    if not card_present:
+        _release_card()
+        state.card_retries = 0
         return {"event": "no_card"}
 
+    if state.connection is None:
+        state.connection, state.card_type = connect_to_card(reader)
+        if state.connection is None:
+            return {"event": "no_card", "retry": _retry_card()}
+    connection, type_byte = state.connection, state.card_type
+
     is_mifare = _is_mifare_classic(type_byte)
     is_ntag = (type_byte == TAG_TYPE_NTAG)
 
@@ -552,6 +970,7 @@ def poll_nfc_blocking():
         if not is_mifare and not is_ntag:
             tag_name = TAG_TYPES.get(type_byte, "unknown")
             _reset_rf_field(connection)
+            _release_card()
             return {"event": "unsupported_tag", "tag_type": tag_name}
 
         # --- Write mode ---
@@ -563,12 +982,16 @@ def poll_nfc_blocking():
             else:
                 success = write_tag_data(connection, payload)
             state.write_pending = None
+            retry = False
             if not success:
                 _reset_rf_field(connection)
+                _release_card()
+                retry = _retry_card()
             return {
                 "event": "write_result",
                 "success": success,
-                "student_id": student_id
+                "student_id": student_id,
+                "retry": retry
             }
 
         # --- Read mode ---
@@ -579,7 +1002,9 @@ def poll_nfc_blocking():
 
         if raw is None:
             _reset_rf_field(connection)
-            return {"event": "empty_tag"}
+            _release_card()
+            return {"event": "empty_tag", "retry": _retry_card()}
+        state.card_retries = 0
 
         student_id = verify_payload(raw)
         if student_id is None:
@@ -587,78 +1012,106 @@ def poll_nfc_blocking():
 
         return {"event": "valid_tag", "student_id": student_id}
 
-    finally:
-        try:
-            connection.disconnect()
-        except Exception:
-            pass
+    except Exception:
+        _release_card()
+        raise
 
 
-async def nfc_poll_loop():
-    """Async loop that polls the NFC reader and broadcasts events."""
-    loop = asyncio.get_event_loop()
-    was_connected = None
+def finish_event(result: dict) -> str | None:
+    """
+    Apply debouncing, log, and serialize the browser message for one poll
+    result. Runs on the NFC thread, so the debounce state is only ever
+    touched there and the event loop is left with nothing but the send.
+    Returns the JSON text to broadcast, or None if there is nothing to send.
+    """
+    event = result["event"]
+
+    if event == "write_result":
+        state.clear_error()
+        if result["success"]:
+            log.info("Tag written for student %s", result["student_id"])
+        else:
+            log.error("Tag write failed for student %s", result["student_id"])
+        return json_dumps({
+            "type": "write_complete",
+            "success": result["success"],
+            "student_id": result.get("student_id", "")
+        })
+
+    if event == "valid_tag":
+        state.clear_error()
+        student_id = result["student_id"]
+        if not state.should_debounce(student_id):
+            log.info("Tag scanned: student %s", student_id)
+            return tag_scan_message(student_id)
+
+    elif event == "invalid_tag":
+        if not state.should_debounce_error("invalid_tag"):
+            log.warning("Invalid tag data: %s", result.get("raw", ""))
+            return MSG_INVALID_TAG
+
+    elif event == "unsupported_tag":
+        if not state.should_debounce_error("unsupported_tag"):
+            tag_type = result.get("tag_type", "unknown")
+            log.warning("Unsupported tag type: %s", tag_type)
+            return unsupported_tag_message(tag_type)
+
+    elif event == "empty_tag":
+        if not state.should_debounce_error("empty_tag"):
+            log.debug("Empty or unreadable tag")
+
+    return None
+
 
+def nfc_thread(loop, queue):
+    """
+    Long-lived thread that owns the NFC reader. Runs poll cycles back to
+    back (each one blocks in the PC/SC driver) and hands the results to
+    the event loop through queue as (event, message) pairs, where message
+    is the already-serialized broadcast text or None.
+    """
     while True:
         try:
-            result = await loop.run_in_executor(executor, poll_nfc_blocking)
+            result = poll_nfc_blocking()
         except Exception as e:
             log.error("NFC poll error: %s", e)
-            await asyncio.sleep(config.POLL_INTERVAL)
-            continue
-
-        if result is None:
-            await asyncio.sleep(config.POLL_INTERVAL)
+            time.sleep(config.POLL_INTERVAL)
             continue
 
         event = result["event"]
+        loop.call_soon_threadsafe(queue.put_nowait, (event, finish_event(result)))
+
+        if event == "no_reader":
+            # Nothing to read until a reader is plugged in
+            card_watcher.wait_for_reader()
+        elif result.get("retry"):
+            # Give the tag a moment to settle in the field before re-reading it
+            time.sleep(config.POLL_INTERVAL)
+
+
+async def nfc_poll_loop():
+    """Async loop that receives NFC events from nfc_thread and broadcasts them."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[tuple[str, str | None]] = asyncio.Queue()
+    threading.Thread(target=nfc_thread, args=(loop, queue), name="nfc", daemon=True).start()
+    was_connected = None
+
+    while True:
+        event, message = await queue.get()
 
         # Track reader connection status
         is_connected = event != "no_reader"
         if is_connected != was_connected:
             was_connected = is_connected
             state.reader_connected = is_connected
-            await broadcast({"type": "reader_status", "connected": is_connected})
+            await broadcast(reader_status_message(is_connected))
             if is_connected:
                 log.info("NFC reader connected")
             else:
                 log.warning("NFC reader not found")
 
-        # Handle events
-        if event == "write_result":
-            state.clear_error()
-            await broadcast({
-                "type": "write_complete",
-                "success": result["success"],
-                "student_id": result.get("student_id", "")
-            })
-            if result["success"]:
-                log.info("Tag written for student %s", result["student_id"])
-            else:
-                log.error("Tag write failed for student %s", result["student_id"])
-
-        elif event == "valid_tag":
-            state.clear_error()
-            student_id = result["student_id"]
-            if not state.should_debounce(student_id):
-                await broadcast({"type": "tag_scan", "student_id": student_id})
-                log.info("Tag scanned: student %s", student_id)
-
-        elif event == "invalid_tag":
-            if not state.should_debounce_error("invalid_tag"):
-                await broadcast({"type": "error", "message": "Invalid or unsigned tag"})
-                log.warning("Invalid tag data: %s", result.get("raw", ""))
-
-        elif event == "unsupported_tag":
-            if not state.should_debounce_error("unsupported_tag"):
-                await broadcast({"type": "error", "message": f"Unsupported tag type: {result.get('tag_type', 'unknown')}"})
-                log.warning("Unsupported tag type: %s", result.get("tag_type", "unknown"))
-
-        elif event == "empty_tag":
-            if not state.should_debounce_error("empty_tag"):
-                log.debug("Empty or unreadable tag")
-
-        await asyncio.sleep(config.POLL_INTERVAL)
+        if message is not None:
+            await broadcast(message)
 
 
 # ---------------------------------------------------------------------------
@@ -666,14 +1119,24 @@ async def nfc_poll_loop():
 # ---------------------------------------------------------------------------
 
 async def main():
+    if config.HMAC_SECRET == DEFAULT_HMAC_SECRET:
+        log.error("HMAC_SECRET in config.py is still the default — set a unique secret before running")
+        raise SystemExit(1)
+
     log.info("Starting NFC Bridge on ws://%s:%d", config.WS_HOST, config.WS_PORT)
 
-    async with websockets.serve(handle_client, config.WS_HOST, config.WS_PORT):
+    # Messages are a few dozen bytes; permessage-deflate only adds latency.
+    # (asyncio already sets TCP_NODELAY on accepted sockets.)
+    async with websockets.serve(handle_client, config.WS_HOST, config.WS_PORT,
+                                compression=None, max_size=MAX_MESSAGE_SIZE):
         await nfc_poll_loop()
 
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        if uvloop is not None:
+            uvloop.run(main())
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         log.info("Shutting down")